@@ -16,279 +16,717 @@ Requirements (local runtime):
 """
 
 import argparse
+import asyncio
 import re
 import sys
 import ast
+import contextlib
 import datetime
+import functools
+import http.cookiejar
+import io
 import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
 
+import orjson
 import yaml
+import youtube_transcript_api
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
 from google.cloud import storage
 import requests
-import xml.etree.ElementTree as ET
-import tempfile
-import glob
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+try:
+    # C-backed parser; noticeably faster on long srv3 caption tracks
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 import yt_dlp
 
 
+def _make_http_session(max_retries=0) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=max_retries)
+    session.mount("https://", adapter)
+    return session
+
+
+# Runs of whitespace, '&' and '-' collapse to a single dash when building slugs
+_SLUG_SEP_RE = re.compile(r"[\s&-]+")
+# Deletion table for everything outside [a-z0-9-]; non-ASCII is removed by the encode in _slug_filter
+_SLUG_ALLOWED = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+_SLUG_DELETE_TABLE = {i: None for i in range(128) if chr(i) not in _SLUG_ALLOWED}
+
+
+def _slug_filter(slug: str) -> str:
+    """Equivalent to re.sub(r'[^a-z0-9-]', '', slug), as two C-level passes."""
+    return slug.encode("ascii", "ignore").decode("ascii").translate(_SLUG_DELETE_TABLE)
+
+
+def slugify_theme(theme: str) -> str:
+    """Anthology file stem for a theme, e.g. "AI Strategy & Leadership" -> "ai-strategy-leadership"."""
+    return _slug_filter(_SLUG_SEP_RE.sub('-', theme.lower()))
+
+# Shared cookie-less transcript API; reusing its pooled session keeps YouTube
+# connections alive across videos instead of re-handshaking per call.
+_TRANSCRIPT_API = YouTubeTranscriptApi(http_client=_make_http_session())
+
+# Keep-alive session for the timedtext endpoints, so listing tracks and fetching
+# one share a TLS connection. A throttled (429) or 5xx response is retried with
+# exponential backoff capped at TIMEDTEXT_BACKOFF_MAX (urllib3 2.x) - a couple of
+# seconds here is far cheaper than falling through to yt-dlp. Retry-After is ignored
+# on purpose: urllib3 sleeps for whatever the server asks, uncapped, which would park
+# a worker for minutes on a throttled IP; the strategy breaker handles that case.
+# raise_on_status=False hands the last response back to the status checks.
+TIMEDTEXT_RETRIES = 3
+TIMEDTEXT_BACKOFF_MAX = 8
+
+
+def _make_timedtext_retry() -> Retry:
+    retry_kwargs = dict(
+        total=TIMEDTEXT_RETRIES,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    try:
+        # Per-instance backoff cap (urllib3 >= 2.0)
+        return Retry(backoff_max=TIMEDTEXT_BACKOFF_MAX, **retry_kwargs)
+    except TypeError:
+        return Retry(**retry_kwargs)
+
+
+_TIMEDTEXT_SESSION = _make_http_session(_make_timedtext_retry())
+
+
+# Video ID forms accepted by extract_video_id: a bare ID, or youtu.be/, v= and /embed/
+# URLs folded into one alternation so a URL costs a single regex scan
+_ID_FULL = re.compile(r"[A-Za-z0-9_-]{11}")
+_ID_IN_URL = re.compile(r"(?:youtu\.be/|v=|/embed/)([A-Za-z0-9_-]{11})")
+
+
 def extract_video_id(url: str) -> str:
     """Extract the 11-char YouTube video ID from common URL forms or return input if it already looks like an ID."""
     url = url.strip()
-    if re.fullmatch(r"[A-Za-z0-9_-]{11}", url):
-        return url
-    m = re.search(r"youtu\.be/([A-Za-z0-9_-]{11})", url)
-    if m:
-        return m.group(1)
-    m = re.search(r"v=([A-Za-z0-9_-]{11})", url)
-    if m:
-        return m.group(1)
-    m = re.search(r"/embed/([A-Za-z0-9_-]{11})", url)
-    if m:
-        return m.group(1)
+    # Nothing shorter than an ID can contain one; skip the regex engine entirely
+    if len(url) >= 11:
+        if _ID_FULL.fullmatch(url):
+            return url
+        m = _ID_IN_URL.search(url)
+        if m:
+            return m.group(1)
     raise ValueError(f"Unable to extract video ID from: {url}")
 
 
+class _StrategyError(Exception):
+    """A fetch strategy failed (network error, throttling, blocked client) rather than
+    finding no English captions; only these count towards the strategy breaker."""
+
+
+# youtube_transcript_api errors that mean the client is blocked or throttled, not that
+# the video is bad (names vary across library versions, so only those present are used)
+_YTA_BLOCKED_ERRORS = tuple(
+    exc for exc in (
+        getattr(youtube_transcript_api, name, None)
+        for name in ("RequestBlocked", "IpBlocked", "TooManyRequests", "YouTubeRequestFailed")
+    )
+    if isinstance(exc, type)
+)
+# Substrings of yt-dlp DownloadError messages that point at throttling, bot checks or
+# the network. Anything else (private/removed/age-restricted video, ...) is per video.
+_YTDLP_BLOCKED_MARKERS = (
+    "429", "too many requests", "not a bot", "sign in to confirm", "http error 5",
+    "timed out", "connection", "temporary failure in name resolution", "getaddrinfo",
+)
+
+
+def _is_ytdlp_block(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return any(marker in msg for marker in _YTDLP_BLOCKED_MARKERS)
+
+
+def _raise_if_throttled(resp: requests.Response) -> None:
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise _StrategyError(f"HTTP {resp.status_code} from {resp.url}")
+
+
+def _list_tracks_checked(video_id: str) -> List[dict]:
+    """_list_tracks, but network errors and throttled responses raise _StrategyError."""
+    list_url = f"https://www.youtube.com/api/timedtext?type=list&v={video_id}"
+    try:
+        lr = _TIMEDTEXT_SESSION.get(list_url, timeout=15)
+    except requests.RequestException as e:
+        raise _StrategyError(str(e)) from e
+    _raise_if_throttled(lr)
+    tracks: List[dict] = []
+    if lr.status_code == 200 and lr.content:
+        try:
+            root = ET.fromstring(lr.content)
+        except ET.ParseError:
+            return tracks
+        for tr in root.iter('track'):
+            tracks.append({
+                'id': tr.get('id'),
+                'lang_code': tr.get('lang_code'),
+                'kind': tr.get('kind'),
+                'name': tr.get('name')
+            })
+    return tracks
+
+
 def _list_tracks(video_id: str) -> List[dict]:
     """List available caption tracks via YouTube timedtext type=list."""
-    list_url = f"https://www.youtube.com/api/timedtext?type=list&v={video_id}"
     try:
-        lr = requests.get(list_url, timeout=15)
-        tracks: List[dict] = []
-        if lr.status_code == 200 and lr.text.strip():
-            root = ET.fromstring(lr.text)
-            for tr in root.findall('.//track'):
-                tracks.append({
-                    'id': tr.get('id'),
-                    'lang_code': tr.get('lang_code'),
-                    'kind': tr.get('kind'),
-                    'name': tr.get('name')
-                })
-        return tracks
+        return _list_tracks_checked(video_id)
     except Exception:
         return []
 
 
-def fetch_transcript_en(video_id: str, cookies_path: Optional[str] = None) -> Tuple[str, str]:
+@functools.lru_cache(maxsize=256)
+def get_upload_date_ytdlp(video_id: str, cookiefile: Optional[str] = None) -> Optional[str]:
     """
-    Fetches English transcript for a YouTube video ID using a robust multi-layer fallback strategy.
-    Returns (transcript_text, publish_date).
-    publish_date is 'YYYY-MM-DD' or 'unknown'.
+    yt-dlp's raw upload_date ('YYYYMMDD') for a video, or None. Memoized so repeat
+    lookups skip the extractor; only the date string is kept, not the info dict.
     """
-    
-    # Helper to get date via yt-dlp
-    def get_date_via_ytdlp(vid):
+    # Only upload_date is read from the result, so skip the DASH/HLS manifest requests.
+    # The default player clients and the watch page are kept: upload_date comes from
+    # the page's microformat, which the android client response does not carry.
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+        'cookiefile': cookiefile,
+        'youtube_include_dash_manifest': False,
+        'youtube_include_hls_manifest': False,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    return (info or {}).get('upload_date')
+
+
+class TranscriptCache:
+    """
+    SQLite-backed cache of fetched transcripts keyed by video_id, so re-processing a
+    video skips every network strategy. Rows older than ttl_seconds are treated as misses.
+    """
+
+    def __init__(self, path: str = "~/.cache/nate_alyzer/transcripts.db", ttl_seconds: int = 7 * 86400):
+        self.path = os.path.expanduser(path)
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "video_id TEXT PRIMARY KEY, transcript TEXT, publish_date TEXT, fetched_at INTEGER)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps this safe across worker threads.
+        # Callers use closing(conn) plus "with conn": the latter only commits/rolls back.
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, video_id: str) -> Optional[Tuple[str, str]]:
         try:
-            url = f"https://www.youtube.com/watch?v={vid}"
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'skip_download': True,
-                'cookiefile': cookies_path if cookies_path and os.path.exists(cookies_path) else None
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                upload_date = info.get('upload_date')
-                if upload_date and len(upload_date) == 8:
-                    return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
-        except Exception:
-            pass
-        return "unknown"
+            with contextlib.closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT transcript, publish_date FROM transcripts WHERE video_id = ? AND fetched_at >= ?",
+                    (video_id, int(time.time()) - self.ttl_seconds),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return (row[0], row[1]) if row else None
 
-    publish_date = get_date_via_ytdlp(video_id)
-    
-    def _read_and_clean_vtt(path):
+    def put(self, video_id: str, transcript: str, publish_date: str) -> None:
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                vtt = f.read()
-            lines = []
-            for line in vtt.splitlines():
-                s = line.strip()
-                if not s or s.startswith("WEBVTT") or "-->" in s or s.isdigit():
-                    continue
-                lines.append(s)
-            return " ".join(lines).replace('\n', ' ')
-        except Exception:
+            with contextlib.closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts (video_id, transcript, publish_date, fetched_at) VALUES (?, ?, ?, ?)",
+                    (video_id, transcript, publish_date, int(time.time())),
+                )
+        except sqlite3.Error:
+            pass
+
+
+_CACHE: Optional[TranscriptCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _default_cache() -> Optional[TranscriptCache]:
+    """
+    Process-wide cache, opt-in: enabled only when NATE_TRANSCRIPT_CACHE names the
+    database path. Created on first use, so importing this module touches no files.
+    """
+    global _CACHE
+    path = os.environ.get("NATE_TRANSCRIPT_CACHE")
+    if not path:
+        return None
+    if _CACHE is None or _CACHE.path != os.path.expanduser(path):
+        with _CACHE_LOCK:
+            if _CACHE is None or _CACHE.path != os.path.expanduser(path):
+                try:
+                    _CACHE = TranscriptCache(path)
+                except (OSError, sqlite3.Error):
+                    return None
+    return _CACHE
+
+
+INNERTUBE_PLAYER_URL = "https://www.youtube.com/youtubei/v1/player"
+# The WEB client is used because its player response includes microformat
+# (the android client's response omits it, so it has no publishDate).
+INNERTUBE_CONTEXT = {"client": {"clientName": "WEB", "clientVersion": "2.20240304.00.00", "hl": "en"}}
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+def _get_date_via_innertube(video_id: str) -> Optional[str]:
+    """One player POST instead of a full yt-dlp extraction; None if the date isn't in the response."""
+    try:
+        resp = _TIMEDTEXT_SESSION.post(
+            INNERTUBE_PLAYER_URL,
+            data=orjson.dumps({"context": INNERTUBE_CONTEXT, "videoId": video_id}),
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
+        if resp.status_code != 200:
             return None
+        date = orjson.loads(resp.content)["microformat"]["playerMicroformatRenderer"]["publishDate"][:10]
+    except (requests.RequestException, orjson.JSONDecodeError, KeyError, TypeError):
+        return None
+    return date if _ISO_DATE_RE.fullmatch(date) else None
+
+
+def _get_publish_date(video_id: str, cookies_path: Optional[str] = None) -> str:
+    """Publish date as 'YYYY-MM-DD' via the innertube player API (yt-dlp metadata as fallback), or 'unknown'."""
+    date = _get_date_via_innertube(video_id)
+    if date:
+        return date
+    try:
+        cookiefile = cookies_path if cookies_path and os.path.exists(cookies_path) else None
+        upload_date = get_upload_date_ytdlp(video_id, cookiefile)
+        if upload_date and len(upload_date) == 8:
+            return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+    except Exception:
+        pass
+    return "unknown"
+
+
+# WEBVTT header, cue-number and timing lines; [^\S\n] is horizontal whitespace (incl. \r)
+_VTT_STRIP_RE = re.compile(r"^[^\S\n]*(?:WEBVTT.*|\d+[^\S\n]*|.*-->.*)$", re.MULTILINE)
+_WS_RE = re.compile(r"\s+")
+
+
+def _clean_vtt_string(vtt: str) -> str:
+    """Caption text of a WEBVTT document as one space-separated line."""
+    return _WS_RE.sub(" ", _VTT_STRIP_RE.sub("", vtt)).strip()
+
+
+# Newlines/CR/tabs inside caption text become spaces in a single C-level pass
+_WS_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+
+def _join_nonempty(pieces, sep: str = " ") -> str:
+    """sep.join over the truthy pieces, written straight into one buffer (no intermediate list)."""
+    buf = io.StringIO()
+    write = buf.write
+    first = True
+    for piece in pieces:
+        if not piece:
+            continue
+        if not first:
+            write(sep)
+        write(piece)
+        first = False
+    return buf.getvalue()
 
-    has_cookies = False
-    if cookies_path and os.path.exists(cookies_path):
-        has_cookies = True
 
-    # --- Layer 1: youtube_transcript_api without cookies ---
+def _fetch_via_api(video_id: str, api: YouTubeTranscriptApi = _TRANSCRIPT_API) -> Optional[str]:
+    """
+    youtube_transcript_api strategy (manual English track, else generated). Returns None
+    when this video has no usable English transcript (none, disabled, unavailable, age
+    restricted, ...); network and blocked-client errors raise _StrategyError.
+    """
     try:
-        api = YouTubeTranscriptApi()
         transcript_list = api.list(video_id)
         try:
             transcript = transcript_list.find_transcript(['en', 'en-US', 'en-GB'])
-        except Exception:
+        except NoTranscriptFound:
             transcript = transcript_list.find_generated_transcript(['en', 'en-US', 'en-GB'])
-            
+
         fetched = transcript.fetch()
-        text = " ".join([item.text for item in fetched])
-        return text.replace('\n', ' '), publish_date
+        return _join_nonempty(item.text for item in fetched).translate(_WS_TABLE)
+    except (requests.RequestException, *_YTA_BLOCKED_ERRORS) as e:
+        raise _StrategyError(str(e)) from e
     except Exception:
-        pass
+        return None
 
-    # --- Layer 2: yt-dlp without cookies (Android Client) ---
+
+# Cookie-authenticated transcript APIs keyed by (cookies_path, mtime): a batch reuses
+# one parsed jar and its pooled session, and an edited cookies.txt gets reloaded.
+_COOKIE_APIS: dict = {}
+
+
+def _cookie_api(cookies_path: str) -> YouTubeTranscriptApi:
+    key = (cookies_path, os.path.getmtime(cookies_path))
+    api = _COOKIE_APIS.get(key)
+    if api is None:
+        cj = http.cookiejar.MozillaCookieJar(cookies_path)
+        cj.load()
+        session = _make_http_session()
+        session.cookies = cj
+        api = YouTubeTranscriptApi(http_client=session)
+        # Drop jars loaded from an older version of the same file
+        for stale in [k for k in _COOKIE_APIS if k[0] == cookies_path]:
+            _COOKIE_APIS.pop(stale, None)
+        _COOKIE_APIS[key] = api
+    return api
+
+
+def _fetch_via_api_with_cookies(video_id: str, cookies_path: str) -> Optional[str]:
     try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            ydl_opts = {
-                "quiet": True,
-                "no_warnings": True,
-                "skip_download": True,
-                "writesubtitles": True,
-                "writeautomaticsub": True,
-                "subtitleslangs": ["en", "en-US", "en-GB"],
-                "subtitlesformat": "vtt",
-                "outtmpl": os.path.join(tmpdir, "%(id)s.%(lang)s.%(ext)s"),
-                "nocheckcertificate": True,
-                "extractor_args": {"youtube": {"player_client": ["android"]}},
-                "retries": 3,
-                "sleep_requests": 1,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
-
-            candidates = []
-            for pattern in (
-                os.path.join(tmpdir, f"{video_id}.en.vtt"),
-                os.path.join(tmpdir, f"{video_id}.en-US.vtt"),
-                os.path.join(tmpdir, f"{video_id}.en-GB.vtt"),
-                os.path.join(tmpdir, f"{video_id}.*.vtt"),
-            ):
-                candidates.extend(glob.glob(pattern))
-
-            if candidates:
-                content = _read_and_clean_vtt(candidates[0])
-                if content:
-                    return content, publish_date
-    except Exception:
-        pass
+        api = _cookie_api(cookies_path)
+    except Exception as e:
+        raise _StrategyError(f"cookie jar {cookies_path}: {e}") from e
+    return _fetch_via_api(video_id, api)
 
-    # --- Layer 3: yt-dlp with cookies (Web Client) ---
-    if has_cookies:
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                ydl_opts = {
-                    "quiet": True,
-                    "no_warnings": True,
-                    "skip_download": True,
-                    "writesubtitles": True,
-                    "writeautomaticsub": True,
-                    "subtitleslangs": ["en", "en-US", "en-GB"],
-                    "subtitlesformat": "vtt",
-                    "outtmpl": os.path.join(tmpdir, "%(id)s.%(lang)s.%(ext)s"),
-                    "nocheckcertificate": True,
-                    "extractor_args": {"youtube": {"player_client": ["web"]}},
-                    "retries": 3,
-                    "sleep_requests": 1,
-                    "cookiefile": cookies_path,
-                }
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
-
-                candidates = []
-                for pattern in (
-                    os.path.join(tmpdir, f"{video_id}.en.vtt"),
-                    os.path.join(tmpdir, f"{video_id}.en-US.vtt"),
-                    os.path.join(tmpdir, f"{video_id}.en-GB.vtt"),
-                    os.path.join(tmpdir, f"{video_id}.*.vtt"),
-                ):
-                    candidates.extend(glob.glob(pattern))
-
-                if candidates:
-                    content = _read_and_clean_vtt(candidates[0])
-                    if content:
-                        return content, publish_date
-        except Exception:
-            pass
 
-    # --- Layer 4: youtube_transcript_api with cookies ---
-    if has_cookies:
-        try:
-            import http.cookiejar
-            cj = http.cookiejar.MozillaCookieJar(cookies_path)
-            cj.load()
-            session = requests.Session()
-            session.cookies = cj
-            api = YouTubeTranscriptApi(http_client=session)
-            transcript_list = api.list(video_id)
-            try:
-                transcript = transcript_list.find_transcript(['en', 'en-US', 'en-GB'])
-            except Exception:
-                transcript = transcript_list.find_generated_transcript(['en', 'en-US', 'en-GB'])
-            
-            fetched = transcript.fetch()
-            text = " ".join([item.text for item in fetched])
-            return text.replace('\n', ' '), publish_date
-        except Exception:
-            pass
+_SUB_LANGS = ("en", "en-US", "en-GB")
 
-    # --- Layer 5: Manual Fallback (TimedText API) ---
+
+def _pick_vtt_url(info: dict) -> Optional[str]:
+    """VTT URL from yt-dlp's info dict: manual subtitles before auto captions, en before en-US/en-GB."""
+    for key in ("subtitles", "automatic_captions"):
+        subs = info.get(key) or {}
+        for lang in _SUB_LANGS:
+            for entry in subs.get(lang) or ():
+                if entry.get("ext") == "vtt" and entry.get("url"):
+                    return entry["url"]
+    return None
+
+
+def _fetch_via_ytdlp(video_id: str, player_client: str, cookiefile: Optional[str] = None) -> Optional[str]:
+    """
+    yt-dlp subtitle strategy for the given player client. yt-dlp only resolves the
+    subtitle URLs; the VTT itself is fetched through the same YoutubeDL instance (so
+    cookies apply) and cleaned in memory (no temp files).
+    Returns None when there are no English subtitles or the video itself is unavailable;
+    throttling, bot checks and network errors raise _StrategyError.
+    """
     try:
-        tracks = _list_tracks(video_id)
-        def pick_track(tracks):
-            # exact en manual
-            for t in tracks:
-                if (t.get('lang_code') == 'en') and (t.get('kind') != 'asr'):
-                    return t
-            # exact en auto
-            for t in tracks:
-                if (t.get('lang_code') == 'en') and (t.get('kind') == 'asr'):
-                    return t
-            # en variants manual
-            for t in tracks:
-                if (t.get('lang_code', '').startswith('en')) and (t.get('kind') != 'asr'):
-                    return t
-            # en variants auto
-            for t in tracks:
-                if (t.get('lang_code', '').startswith('en')) and (t.get('kind') == 'asr'):
-                    return t
-            return tracks[0] if tracks else None
-
-        best = pick_track(tracks)
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "nocheckcertificate": True,
+            "extractor_args": {"youtube": {"player_client": [player_client]}},
+            "retries": 3,
+            "sleep_requests": 1,
+        }
+        if cookiefile:
+            ydl_opts["cookiefile"] = cookiefile
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+            url = _pick_vtt_url(info or {})
+            if not url:
+                return None
+            # Download through yt-dlp's own opener so the cookie jar (and proxy settings)
+            # also apply to the subtitle request, not just to extraction
+            with ydl.urlopen(url) as resp:
+                vtt = resp.read().decode("utf-8", errors="ignore")
+        return _clean_vtt_string(vtt) or None
+    except Exception as e:
+        if _is_ytdlp_block(e):
+            raise _StrategyError(str(e)) from e
+        return None
+
+
+def _pick_track(tracks: List[dict], any_language: bool = False) -> Optional[dict]:
+    # exact en manual
+    for t in tracks:
+        if (t.get('lang_code') == 'en') and (t.get('kind') != 'asr'):
+            return t
+    # exact en auto
+    for t in tracks:
+        if (t.get('lang_code') == 'en') and (t.get('kind') == 'asr'):
+            return t
+    # en variants manual
+    for t in tracks:
+        if (t.get('lang_code', '').startswith('en')) and (t.get('kind') != 'asr'):
+            return t
+    # en variants auto
+    for t in tracks:
+        if (t.get('lang_code', '').startswith('en')) and (t.get('kind') == 'asr'):
+            return t
+    # any language at all, only when explicitly asked for (last-resort layer)
+    if any_language and tracks:
+        return tracks[0]
+    return None
+
+
+def _iter_element_text(stream, tag: str):
+    """
+    Stream-parse XML from a file-like object and yield the text of each <tag> element
+    as it closes. Consumed elements are cleared (and, on lxml, detached) so memory stays
+    flat however many caption nodes the track has.
+    """
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if elem.tag != tag:
+            continue
+        yield elem.text
+        elem.clear()
+        if hasattr(elem, "getparent"):
+            parent = elem.getparent()
+            while parent is not None and elem.getprevious() is not None:
+                del parent[0]
+
+
+def _fetch_via_timedtext(video_id: str, any_language: bool = False) -> Optional[str]:
+    """
+    Manual fallback against the public timedtext endpoint. Returns None when no English
+    track is found (with any_language, when there is no track at all); network errors
+    and 429/5xx responses raise _StrategyError.
+    """
+    try:
+        best = _pick_track(_list_tracks_checked(video_id), any_language)
         if best and best.get('id'):
             track_id = best['id']
             track_url = f"https://www.youtube.com/api/timedtext?type=track&v={video_id}&id={track_id}&fmt=srv3"
-            tr = requests.get(track_url, timeout=15)
-            if tr.status_code == 200 and tr.text.strip():
-                try:
-                    troot = ET.fromstring(tr.text)
-                    texts = []
-                    for node in troot.findall('.//text'):
-                        if node.text:
-                            texts.append(node.text)
-                    if texts:
-                        text = " ".join(texts)
-                        return text.replace('\n', ' '), publish_date
-                except Exception:
-                    pass
-        
+            with _TIMEDTEXT_SESSION.get(track_url, stream=True, timeout=15) as tr:
+                _raise_if_throttled(tr)
+                if tr.status_code == 200:
+                    try:
+                        tr.raw.decode_content = True
+                        text = _join_nonempty(_iter_element_text(tr.raw, 'text'))
+                        if text:
+                            return text.translate(_WS_TABLE)
+                    except ET.ParseError:
+                        pass
+        if any_language:
+            # The English probes below already ran in the English-only pass
+            return None
+
         for lang in ("en", "en-US", "en-GB"):
             for params in (f"lang={lang}", f"lang={lang}&kind=asr"):
                 url = f"https://www.youtube.com/api/timedtext?{params}&v={video_id}"
-                try:
-                    r = requests.get(url, timeout=15)
-                    if r.status_code == 200 and r.text.strip():
-                        try:
-                            root = ET.fromstring(r.text)
-                        except ET.ParseError:
-                            continue
-                        texts = []
-                        for node in root.findall('.//text'):
-                            t = (node.text or '').strip()
-                            if t:
-                                texts.append(t)
-                        if texts:
-                            return "\n".join(texts), publish_date
-                except Exception:
-                    continue
+                r = _TIMEDTEXT_SESSION.get(url, timeout=15)
+                _raise_if_throttled(r)
+                if r.status_code == 200 and r.content:
+                    try:
+                        root = ET.fromstring(r.content)
+                    except ET.ParseError:
+                        continue
+                    text = _join_nonempty(((node.text or '').strip() for node in root.iter('text')), "\n")
+                    if text:
+                        return text
+    except requests.RequestException as e:
+        raise _StrategyError(str(e)) from e
+    return None
+
+
+# Per-process strategy breaker: once a strategy errors STRATEGY_FAIL_LIMIT times in a
+# row (typically an IP block or throttling), skip it for STRATEGY_COOLDOWN_SECONDS so a
+# batch stops paying its latency on every video. A video without English captions is
+# not an error and leaves the count alone; one success resets it.
+STRATEGY_FAIL_LIMIT = 5
+STRATEGY_COOLDOWN_SECONDS = 300
+_STRATEGY_FAILS: dict = defaultdict(int)
+_STRATEGY_SKIP_UNTIL: dict = {}
+_STRATEGY_LOCK = threading.Lock()
+
+
+async def _run_strategy(name: str, fn, *args, executor: Optional[ThreadPoolExecutor] = None) -> Optional[str]:
+    """Run one fetch strategy in a worker thread (default executor unless given) unless its breaker is open."""
+    skip_until = _STRATEGY_SKIP_UNTIL.get(name, 0)
+    if time.monotonic() < skip_until:
+        print(f"INFO: Skipping strategy '{name}' (breaker open for another {skip_until - time.monotonic():.0f}s)")
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        text = await loop.run_in_executor(executor, functools.partial(fn, *args))
+    except _StrategyError as e:
+        with _STRATEGY_LOCK:
+            _STRATEGY_FAILS[name] += 1
+            if _STRATEGY_FAILS[name] >= STRATEGY_FAIL_LIMIT:
+                _STRATEGY_SKIP_UNTIL[name] = time.monotonic() + STRATEGY_COOLDOWN_SECONDS
+                _STRATEGY_FAILS[name] = 0
+                print(f"WARN: Strategy '{name}' failed {STRATEGY_FAIL_LIMIT} times in a row ({e}); "
+                      f"skipping it for {STRATEGY_COOLDOWN_SECONDS}s")
+        return None
     except Exception:
+        # Unexpected bug in a helper: don't let it poison the breaker
+        return None
+    if text:
+        with _STRATEGY_LOCK:
+            _STRATEGY_FAILS[name] = 0
+            _STRATEGY_SKIP_UNTIL.pop(name, None)
+    return text
+
+
+# Upper bound on how long the lightweight HTTP strategies may race before we
+# fall through to the slower yt-dlp layers.
+RACE_TIMEOUT_SECONDS = 30
+
+
+async def _race_http_strategies(video_id: str) -> Optional[str]:
+    """
+    Run the cheap HTTP strategies (transcript API, timedtext) concurrently and return
+    the first non-empty transcript. The rest are cancelled; a worker thread that is
+    already mid-request finishes on its own, but its result is discarded.
+
+    The race gets its own executor, shut down without waiting: asyncio.run() joins the
+    loop's default executor on exit, so a loser running there would hold every sync
+    caller until the slowest strategy finished.
+    """
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="transcript-race")
+    tasks = [
+        asyncio.create_task(_run_strategy("transcript-api", _fetch_via_api, video_id, executor=executor)),
+        asyncio.create_task(_run_strategy("timedtext", _fetch_via_timedtext, video_id, executor=executor)),
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=RACE_TIMEOUT_SECONDS):
+            text = await next_done
+            if text:
+                return text
+    except (asyncio.TimeoutError, TimeoutError):
         pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None
 
-    return None, "unknown"
+
+async def fetch_transcript_en_async(video_id: str, cookies_path: Optional[str] = None, use_cache: bool = True, want_date: bool = True) -> Tuple[Optional[str], str]:
+    """
+    Async core of fetch_transcript_en. A fresh cache hit returns without any network I/O;
+    otherwise the HTTP strategies race each other and the yt-dlp and cookie-based layers
+    remain a serial fallback behind them. The publish-date lookup runs alongside the
+    transcript fetch, and is skipped entirely when want_date is False.
+    """
+    cache = _default_cache() if use_cache else None
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, video_id)
+        if hit:
+            return hit
+
+    # Same reasoning as the race: a dedicated executor lets a failed fetch return
+    # without waiting for an abandoned date lookup.
+    date_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="publish-date") if want_date else None
+    try:
+        date_future = (
+            asyncio.get_running_loop().run_in_executor(date_executor, _get_publish_date, video_id, cookies_path)
+            if date_executor is not None else None
+        )
+        text = await _fetch_text(video_id, cookies_path)
+        if not text:
+            if date_future is not None:
+                date_future.cancel()
+            return None, "unknown"
+        publish_date = await date_future if date_future is not None else "unknown"
+    finally:
+        if date_executor is not None:
+            date_executor.shutdown(wait=False, cancel_futures=True)
+
+    # Only complete results are persisted; an unknown date is retried next time
+    if cache is not None and publish_date != "unknown":
+        await asyncio.to_thread(cache.put, video_id, text, publish_date)
+    return text, publish_date
+
+
+async def _fetch_text(video_id: str, cookies_path: Optional[str]) -> Optional[str]:
+    # --- Layers 1 + 5: youtube_transcript_api and timedtext, raced ---
+    text = await _race_http_strategies(video_id)
+    if text:
+        return text
+
+    has_cookies = bool(cookies_path and os.path.exists(cookies_path))
+
+    # --- Layer 2: yt-dlp without cookies (Android Client) ---
+    text = await _run_strategy("ytdlp-android", _fetch_via_ytdlp, video_id, "android")
+    if text:
+        return text
+
+    if has_cookies:
+        # --- Layer 3: yt-dlp with cookies (Web Client) ---
+        text = await _run_strategy("ytdlp-web-cookies", _fetch_via_ytdlp, video_id, "web", cookies_path)
+        if text:
+            return text
+
+        # --- Layer 4: youtube_transcript_api with cookies ---
+        text = await _run_strategy("transcript-api-cookies", _fetch_via_api_with_cookies, video_id, cookies_path)
+        if text:
+            return text
+
+    # --- Layer 6: timedtext, first track in any language (last resort) ---
+    return await _run_strategy("timedtext-any", _fetch_via_timedtext, video_id, True)
+
+
+def fetch_transcript_en(video_id: str, cookies_path: Optional[str] = None, use_cache: bool = True, want_date: bool = True) -> Tuple[str, str]:
+    """
+    Fetches English transcript for a YouTube video ID using a robust multi-layer fallback strategy.
+    Returns (transcript_text, publish_date).
+    publish_date is 'YYYY-MM-DD' or 'unknown' ('unknown' without a lookup when want_date is False).
+    When NATE_TRANSCRIPT_CACHE is set, results with a known date are cached there (see
+    TranscriptCache); pass use_cache=False to bypass it.
+
+    This runs its own event loop, so it must not be called from a coroutine; async
+    callers should await fetch_transcript_en_async instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_transcript_en_async(video_id, cookies_path, use_cache, want_date))
+    raise RuntimeError("fetch_transcript_en() called from a running event loop; await fetch_transcript_en_async() instead")
+
+
+async def fetch_transcripts_many(video_ids: List[str], cookies_path: Optional[str] = None, concurrency: int = 8) -> dict:
+    """
+    Fetch transcripts for several videos concurrently (network-bound, so wall time
+    approaches the slowest single fetch). Returns {video_id: (transcript_text, publish_date)};
+    a video whose fetch raises maps to (None, "unknown") instead of cancelling the batch.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(vid: str) -> Tuple[Optional[str], str]:
+        async with sem:
+            try:
+                return await fetch_transcript_en_async(vid, cookies_path)
+            except Exception as e:
+                print(f"Error fetching transcript for {vid}: {e}")
+                return None, "unknown"
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = {vid: tg.create_task(one(vid)) for vid in dict.fromkeys(video_ids)}
+    return {vid: task.result() for vid, task in tasks.items()}
+
+
+def fetch_transcripts_bulk(urls: List[str], cookies_path: Optional[str] = None, max_workers: int = 8) -> dict:
+    """
+    Sync wrapper around fetch_transcripts_many for callers without an event loop (e.g. a
+    playlist or channel dump), so bulk fetches share the async path and its race.
+    Returns {url: (transcript_text, publish_date)}; a URL that cannot be parsed or
+    fetched maps to (None, "unknown").
+    """
+    url_to_id = {}
+    for url in dict.fromkeys(urls):
+        try:
+            url_to_id[url] = extract_video_id(url)
+        except ValueError:
+            url_to_id[url] = None
+
+    ids = [vid for vid in url_to_id.values() if vid]
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        by_id = asyncio.run(fetch_transcripts_many(ids, cookies_path, concurrency=max_workers)) if ids else {}
+    else:
+        raise RuntimeError("fetch_transcripts_bulk() called from a running event loop; await fetch_transcripts_many() instead")
+    return {url: by_id.get(vid, (None, "unknown")) for url, vid in url_to_id.items()}
 
 
 def upload_to_gcs(bucket_name: str, video_id: str, content: str, publish_date: str) -> str:
@@ -423,6 +861,48 @@ def append_to_anthology(bucket_name: str, theme_file: str, video_id: str, publis
         return False
 
 
+def append_to_anthology_compose(bucket_name: str, theme_file: str, video_id: str, publish_date: str, content: str, transcript: str = ""):
+    """
+    Appends the entry to the anthology file via GCS object composition, so only the new
+    entry is uploaded instead of downloading and re-uploading the whole anthology.
+    Unlike append_to_anthology it does not scan for duplicates (that would need the full
+    download); callers are expected to dedupe via Firestore status.
+    """
+    tmp_blob = None
+    try:
+        client = storage.Client()
+        bucket = client.bucket(bucket_name)
+
+        new_entry = f"\n\n---\n\n<!-- VIDEO_ID: {video_id} -->\nDate: {publish_date}\n\n{content}"
+        if transcript:
+            new_entry += f"\n\n---\n{transcript}"
+
+        existing = bucket.get_blob(theme_file)
+        if existing is None:
+            header = f"# {theme_file.replace('.md', '').replace('-', ' ').title()}\n\n"
+            # if_generation_match=0: only create if nobody else did in the meantime
+            bucket.blob(theme_file).upload_from_string(header + new_entry, content_type="text/markdown", if_generation_match=0)
+            return True
+
+        tmp_blob = bucket.blob(f"tmp/{uuid.uuid4().hex}.md")
+        tmp_blob.upload_from_string(new_entry, content_type="text/markdown")
+
+        dest = bucket.blob(theme_file)
+        dest.content_type = "text/markdown"
+        # Generation precondition makes concurrent appends fail instead of clobbering each other
+        dest.compose([existing, tmp_blob], if_generation_match=existing.generation)
+        return True
+    except Exception as e:
+        print(f"Error appending to anthology: {e}")
+        return False
+    finally:
+        if tmp_blob is not None:
+            try:
+                tmp_blob.delete()
+            except Exception:
+                pass
+
+
 def process_video(engine_resource: str, project: str, location: str, video_id: str, publish_date: str, transcript_text: str) -> dict:
     import vertexai
     from vertexai.preview import reasoning_engines
@@ -629,9 +1109,7 @@ def main():
                 
                 # Normalize filename
                 # e.g. "AI Strategy & Leadership" -> "ai-strategy-leadership.md"
-                slug = theme.lower().replace(" & ", "-").replace(" ", "-").replace("---", "-")
-                # Remove any non-alphanumeric chars except dashes
-                slug = re.sub(r'[^a-z0-9-]', '', slug)
+                slug = slugify_theme(theme)
                 
                 # Fix: Remove trailing 'n' if it was captured by regex (common artifact)
                 if slug.endswith('n') and len(slug) > 1:
@@ -644,8 +1122,7 @@ def main():
                 
                 # Better fix for theme: Unescape it too!
                 theme = theme.replace('\\n', '').strip()
-                slug = theme.lower().replace(" & ", "-").replace(" ", "-").replace("---", "-")
-                slug = re.sub(r'[^a-z0-9-]', '', slug)
+                slug = slugify_theme(theme)
 
                 # Safety check for filename length
                 if len(slug) > 100:
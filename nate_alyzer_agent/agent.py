@@ -77,7 +77,7 @@ class NateAlyzer:
                 tool_calls = getattr(response, "tool_calls", None) or []
                 names = [tc.get("name") for tc in tool_calls]
                 self.logger.debug(
-                    f"Model responded with {len(tool_calls)} tool call(s): {names}"
+                    "Model responded with %d tool call(s): %s", len(tool_calls), names
                 )
             return {"messages": [response]}
 
@@ -86,7 +86,7 @@ class NateAlyzer:
             tool_calls = getattr(last, "tool_calls", None) or []
             tool_messages = []
             if self.debug:
-                self.logger.debug(f"Executing {len(tool_calls)} tool call(s)...")
+                self.logger.debug("Executing %d tool call(s)...", len(tool_calls))
             for tc in tool_calls:
                 name = tc.get("name")
                 args = tc.get("args") or {}
@@ -94,19 +94,19 @@ class NateAlyzer:
                 if not tool:
                     content = json.dumps({"error": f"Unknown tool: {name}"})
                     if self.debug:
-                        self.logger.debug(f"Unknown tool requested by model: {name}")
+                        self.logger.debug("Unknown tool requested by model: %s", name)
                     tool_messages.append(
                         ToolMessage(content=content, tool_call_id=tc.get("id", ""))
                     )
                     continue
                 try:
                     if self.debug:
-                        self.logger.debug(f"Calling tool '{name}' with args: {args}")
+                        self.logger.debug("Calling tool '%s' with args: %s", name, args)
                     result = tool.invoke(args)
                 except Exception as e:
                     result = {"error": f"Tool '{name}' execution failed: {e}"}
                     if self.debug:
-                        self.logger.debug(f"Tool '{name}' raised exception: {e}")
+                        self.logger.debug("Tool '%s' raised exception: %s", name, e)
                 if not isinstance(result, str):
                     try:
                         content = json.dumps(result)
@@ -116,7 +116,7 @@ class NateAlyzer:
                     content = result
                 if self.debug:
                     preview = content if len(content) <= 300 else content[:300] + "..."
-                    self.logger.debug(f"Tool '{name}' result preview: {preview}")
+                    self.logger.debug("Tool '%s' result preview: %s", name, preview)
                 tool_messages.append(
                     ToolMessage(content=content, tool_call_id=tc.get("id", ""))
                 )
@@ -141,7 +141,7 @@ class NateAlyzer:
         incoming = inputs.get("messages", [])
         if self.debug:
             self.logger.debug(
-                f"Query received with {len(incoming)} incoming message(s); prepending system instruction."
+                "Query received with %d incoming message(s); prepending system instruction.", len(incoming)
             )
         state = {
             "messages": [SystemMessage(content=self._system_instruction), *incoming],
@@ -3,8 +3,11 @@
 
 import os
 import logging
+import threading
+import time
+import orjson
 import requests
-from typing import List, Optional, Dict, Any, TypedDict, Annotated, Sequence
+from typing import List, Optional, Dict, Any, Tuple, TypedDict, Annotated, Sequence
 from pydantic import BaseModel, Field
 
 # Third-party imports that MUST be in requirements
@@ -20,6 +23,7 @@ from google.oauth2 import id_token as google_id_token
 from google.auth.transport.requests import Request as GoogleAuthRequest
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
+from cachetools import TTLCache
 
 # --- CONFIGURATION (HARDCODED FOR STABILITY) ---
 PROJECT_ID = "nate-digital-twin"
@@ -35,41 +39,98 @@ UPDATER_URL = f"https://{LOCATION}-{PROJECT_ID}.cloudfunctions.net/anthology-upd
 # These are defined globally so they are available to the tools.
 # Note: In the cloud environment, _SESSION will be re-initialized when the module is loaded.
 
-def _make_session() -> requests.Session:
-    session = requests.Session()
-    retries = Retry(
-        total=3,
-        backoff_factor=0.5,
+def _make_retry() -> Retry:
+    retry_kwargs = dict(
+        total=5,
+        backoff_factor=0.3,
         status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=["POST", "GET"],
         raise_on_status=False,
+        respect_retry_after_header=True,
     )
-    adapter = HTTPAdapter(max_retries=retries)
+    try:
+        # Jitter spreads retries from concurrent agent instances (urllib3 >= 2.0)
+        return Retry(backoff_jitter=0.3, **retry_kwargs)
+    except TypeError:
+        # urllib3 < 2.0: no jitter support, Retry-After is still honored
+        return Retry(**retry_kwargs)
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=_make_retry())
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
+class _PicklableLock:
+    """threading.Lock wrapper that survives cloudpickle (the lock is recreated on load)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+
 _SESSION = _make_session()
 _TIMEOUT = (5, 300)
-_ID_TOKEN_CACHE: Dict[str, str] = {}
+# Google ID tokens live for 1 hour; refresh a little early.
+_ID_TOKEN_TTL_SECONDS = 3000
+# audience -> (token, expires_at). Reads are lock-free; misses take the lock and
+# re-check so concurrent tool calls trigger a single fetch per audience.
+_ID_TOKEN_CACHE: Dict[str, Tuple[str, float]] = {}
+_ID_TOKEN_LOCK = _PicklableLock()
 
 def _auth_headers(audience_url: str) -> Dict[str, str]:
     """Return Authorization header with a Google ID token."""
     # In the remote environment, we might need to handle auth differently if not using default creds,
     # but Application Default Credentials (ADC) usually work for Cloud Run/Functions.
     try:
-        token = _ID_TOKEN_CACHE.get(audience_url)
-        if not token:
-            # This requires google-auth
-            token = google_id_token.fetch_id_token(GoogleAuthRequest(), audience_url)
-            _ID_TOKEN_CACHE[audience_url] = token
-        return {"Authorization": f"Bearer {token}"}
+        entry = _ID_TOKEN_CACHE.get(audience_url)
+        if entry is None or entry[1] <= time.monotonic():
+            with _ID_TOKEN_LOCK:
+                entry = _ID_TOKEN_CACHE.get(audience_url)
+                if entry is None or entry[1] <= time.monotonic():
+                    # This requires google-auth
+                    token = google_id_token.fetch_id_token(GoogleAuthRequest(), audience_url)
+                    entry = (token, time.monotonic() + _ID_TOKEN_TTL_SECONDS)
+                    _ID_TOKEN_CACHE[audience_url] = entry
+        return {"Authorization": f"Bearer {entry[0]}"}
     except Exception as e:
         # Fallback or error. In some local contexts, this might fail if not logged in.
         # We log but don't crash, letting the request fail naturally if auth is missing.
         print(f"Warning: Could not fetch ID token for {audience_url}: {e}")
         return {}
 
+# Per-warm-instance transcript cache. Agent Engine keeps instances warm between
+# requests, so LLM retries / re-prompts for the same video skip the retriever.
+# Only successful responses are stored; the TTL bounds staleness if GCS changes.
+_TRANSCRIPT_CACHE: TTLCache = TTLCache(maxsize=256, ttl=3600)
+_TRANSCRIPT_CACHE_LOCK = _PicklableLock()
+
+def _fetch_transcript(video_id: str) -> Any:
+    """Call the retriever Cloud Function, memoizing successful results by video_id."""
+    with _TRANSCRIPT_CACHE_LOCK:
+        cached = _TRANSCRIPT_CACHE.get(video_id)
+    if cached is not None:
+        return cached
+    headers = _auth_headers(RETRIEVER_URL)
+    response = _SESSION.post(RETRIEVER_URL, json={"video_id": video_id}, timeout=_TIMEOUT, headers=headers)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    with _TRANSCRIPT_CACHE_LOCK:
+        _TRANSCRIPT_CACHE[video_id] = data
+    return data
+
 # --- PYDANTIC MODELS ---
 class RetrieveTranscriptArgs(BaseModel):
     video_id: str = Field(..., description="The YouTube or internal video identifier")
@@ -87,12 +148,8 @@ class SaveAnthologyArgs(BaseModel):
 @tool(args_schema=RetrieveTranscriptArgs)
 def retrieve_transcript(video_id: str) -> dict:
     """Fetch the raw transcript text for a given video_id."""
-    payload = {"video_id": video_id}
     try:
-        headers = _auth_headers(RETRIEVER_URL)
-        response = _SESSION.post(RETRIEVER_URL, json=payload, timeout=_TIMEOUT, headers=headers)
-        response.raise_for_status()
-        return {"status": "ok", "data": response.json()}
+        return {"status": "ok", "data": _fetch_transcript(video_id)}
     except Exception as e:
         return {"status": "error", "message": f"retriever failed: {str(e)}"}
 
@@ -104,7 +161,7 @@ def distill_and_classify_transcript(transcript_text: str) -> dict:
         headers = _auth_headers(PROCESSOR_URL)
         response = _SESSION.post(PROCESSOR_URL, json=payload, timeout=_TIMEOUT, headers=headers)
         response.raise_for_status()
-        return {"status": "ok", "data": response.json()}
+        return {"status": "ok", "data": orjson.loads(response.content)}
     except Exception as e:
         return {"status": "error", "message": f"processor failed: {str(e)}"}
 
@@ -118,13 +175,42 @@ def save_transcript_to_anthology(processed_transcript: str, theme: str, video_id
         headers = _auth_headers(UPDATER_URL)
         response = _SESSION.post(UPDATER_URL, json=payload, timeout=_TIMEOUT, headers=headers)
         response.raise_for_status()
-        return {"status": "ok", "data": response.json()}
+        return {"status": "ok", "data": orjson.loads(response.content)}
     except Exception as e:
         return {"status": "error", "message": f"updater failed: {str(e)}"}
 
 # --- AGENT STATE & CLASS ---
+def _merge_tool_cache(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    return {**(left or {}), **(right or {})}
+
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # (tool name, canonical args) -> successful ToolMessage content, per conversation
+    tool_cache: Annotated[Dict[str, str], _merge_tool_cache]
+
+def _tool_call_key(tool_call: dict) -> str:
+    args = orjson.dumps(tool_call.get("args") or {}, option=orjson.OPT_SORT_KEYS).decode()
+    return f"{tool_call['name']}:{args}"
+
+def _is_ok_tool_result(content: Any) -> bool:
+    try:
+        return orjson.loads(content).get("status") == "ok"
+    except Exception:
+        return False
+
+SYSTEM_INSTRUCTION = (
+    "You are an orchestration agent. Use tools to complete tasks. "
+    "When asked to process a video transcript, follow this plan strictly: "
+    "1) Call retrieve_transcript(video_id). "
+    "2) Take the returned transcript_text and call distill_and_classify_transcript(transcript_text). "
+    "3) Take processed_transcript and theme from step 2 and call "
+    "save_transcript_to_anthology(processed_transcript, theme, video_id). "
+    "Always call tools in order, passing outputs into the next step. Do not answer directly."
+)
+
+# Compiled graphs keyed by (model, project, location); built once per process.
+_COMPILED_GRAPHS: Dict[tuple, Any] = {}
+_GRAPH_LOCK = _PicklableLock()
 
 class NateAlyzer:
     def __init__(self, model: str = AGENT_MODEL, project: str = PROJECT_ID, location: str = LOCATION):
@@ -138,51 +224,72 @@ class NateAlyzer:
     def set_up(self):
         """Initialize the agent resources. Called by Agent Engine on startup."""
         vertexai.init(project=self.project, location=self.location)
-        
+
+        # The system message is seeded once as the first entry of the conversation
+        # (see query), so model_node never has to copy the history per turn.
+        self.system_message = SystemMessage(content=SYSTEM_INSTRUCTION)
+
+        # Reuse the compiled graph if this process already built one, so warm
+        # re-instantiations skip model/tool setup and graph compilation.
+        key = (self.model_name, self.project, self.location)
+        with _GRAPH_LOCK:
+            graph = _COMPILED_GRAPHS.get(key)
+            if graph is None:
+                graph = self._build_graph()
+                _COMPILED_GRAPHS[key] = graph
+        self.graph = graph
+
+    def _build_graph(self):
         model = ChatVertexAI(model_name=self.model_name, temperature=0)
         model_with_tools = model.bind_tools(self.tools)
         tool_node = ToolNode(self.tools)
 
-        # Define system instruction
-        system_instruction = (
-            "You are an orchestration agent. Use tools to complete tasks. "
-            "When asked to process a video transcript, follow this plan strictly: "
-            "1) Call retrieve_transcript(video_id). "
-            "2) Take the returned transcript_text and call distill_and_classify_transcript(transcript_text). "
-            "3) Take processed_transcript and theme from step 2 and call "
-            "save_transcript_to_anthology(processed_transcript, theme, video_id). "
-            "Always call tools in order, passing outputs into the next step. Do not answer directly."
-        )
-
         def model_node(state: AgentState):
-            messages = state["messages"]
-            # Prepend system message if not present (simple check)
-            # In a robust app, we might manage this differently, but for now we trust the graph.
-            if not isinstance(messages[0], SystemMessage):
-                messages = [SystemMessage(content=system_instruction)] + list(messages)
-            
-            response = model_with_tools.invoke(messages)
+            response = model_with_tools.invoke(state["messages"])
+            tool_calls = getattr(response, "tool_calls", None)
+            cache = state.get("tool_cache") or {}
+            # If the model repeats tool calls that already succeeded in this
+            # conversation, answer them from the cache instead of re-invoking the
+            # Cloud Functions. Mixed new/duplicate batches still go to the tools node.
+            if tool_calls and all(_tool_call_key(tc) in cache for tc in tool_calls):
+                cached = [
+                    ToolMessage(content=cache[_tool_call_key(tc)], name=tc["name"], tool_call_id=tc["id"])
+                    for tc in tool_calls
+                ]
+                return {"messages": [response, *cached]}
             return {"messages": [response]}
 
+        def tools_node(state: AgentState):
+            result = tool_node.invoke(state)
+            calls = {tc["id"]: tc for tc in getattr(state["messages"][-1], "tool_calls", None) or []}
+            new_entries = {}
+            for msg in result["messages"]:
+                tc = calls.get(getattr(msg, "tool_call_id", None))
+                if tc is not None and _is_ok_tool_result(msg.content):
+                    new_entries[_tool_call_key(tc)] = msg.content
+            return {"messages": result["messages"], "tool_cache": new_entries}
+
         def should_continue(state: AgentState):
             last = state["messages"][-1]
+            if isinstance(last, ToolMessage):
+                return "cached"
             if isinstance(last, AIMessage) and getattr(last, "tool_calls", None):
                 return "continue"
             return "end"
 
         workflow = StateGraph(AgentState)
         workflow.add_node("model", model_node)
-        workflow.add_node("tools", tool_node)
+        workflow.add_node("tools", tools_node)
         workflow.set_entry_point("model")
-        workflow.add_conditional_edges("model", should_continue, {"continue": "tools", "end": END})
+        workflow.add_conditional_edges("model", should_continue, {"continue": "tools", "cached": "model", "end": END})
         workflow.add_edge("tools", "model")
-        self.graph = workflow.compile()
+        return workflow.compile()
 
     def query(self, prompt: str) -> dict:
         """Entry point for the Agent Engine."""
         # The input is a simple string prompt.
         # The output must be JSON-serializable.
-        inputs = {"messages": [("user", prompt)]}
+        inputs = {"messages": [self.system_message, ("user", prompt)], "tool_cache": {}}
         result = self.graph.invoke(inputs)
         
         # Extract the final response text
@@ -206,6 +313,8 @@ def deploy():
         "langgraph",
         "pydantic",
         "requests",
+        "cachetools",
+        "orjson",
         "google-auth",
         "google-auth-httplib2",
         "google-auth-oauthlib"
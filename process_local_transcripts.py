@@ -21,6 +21,7 @@ Requirements:
 import argparse
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Tuple
 
@@ -29,8 +30,11 @@ import vertexai
 from vertexai.preview import reasoning_engines
 
 
+_VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+
 def is_video_id(name: str) -> bool:
-    return bool(re.fullmatch(r"[A-Za-z0-9_-]{11}", name))
+    return _VIDEO_ID_RE.fullmatch(name) is not None
 
 
 def upload_to_gcs(bucket_name: str, video_id: str, content: str) -> str:
@@ -51,6 +55,47 @@ def process_with_engine(engine_resource: str, project: str, location: str, video
     return agent.query(prompt=prompt)
 
 
+# Firestore caps batched reads/writes at 500 operations
+_FIRESTORE_BATCH_LIMIT = 500
+
+
+def _chunks(items: List, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def process_file(path: Path, args, videos_ref) -> Tuple[str, str, str]:
+    """Read, upload and trigger the agent for a single transcript file.
+
+    Returns (video_id, outcome, error_message); outcome is "processed" or "failed".
+    """
+    video_id = path.stem
+    doc_ref = videos_ref.document(video_id) if videos_ref is not None else None
+
+    def _fail(msg: str, e: Exception) -> Tuple[str, str, str]:
+        if doc_ref is not None:
+            doc_ref.set({"status": "FAILED", "error": str(e)}, merge=True)
+        return video_id, "failed", f"{msg}: {e}"
+
+    try:
+        content = path.read_text(encoding="utf-8", errors="ignore")
+    except Exception as e:
+        return _fail("read_failed", e)
+
+    try:
+        uri = upload_to_gcs(args.bucket, video_id, content)
+        print(f"Uploaded {path.name} -> {uri}")
+    except Exception as e:
+        return _fail("upload_failed", e)
+
+    try:
+        _ = process_with_engine(args.engine, args.project, args.location, video_id)
+        print(f"Triggered agent for {video_id}")
+        return video_id, "processed", ""
+    except Exception as e:
+        return _fail("agent_failed", e)
+
+
 def main():
     ap = argparse.ArgumentParser(description="Upload local transcripts and trigger Agent Engine")
     ap.add_argument("--engine", default="projects/134885012683/locations/us-central1/reasoningEngines/2255577735638286336", help="Agent Engine resource path")
@@ -58,6 +103,10 @@ def main():
     ap.add_argument("--project", default="nate-digital-twin", help="GCP project ID")
     ap.add_argument("--location", default="us-central1", help="GCP location")
     ap.add_argument("--dir", default="transcripts", help="Local directory containing <video_id>.txt files")
+    # Serial by default: anthology_updater rewrites the theme file with an unguarded
+    # download/concatenate/upload, so concurrent videos sharing a theme can drop entries.
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Number of transcripts to process concurrently (>1 is only safe when videos map to different themes)")
     args = ap.parse_args()
 
     folder = Path(args.dir)
@@ -80,65 +129,64 @@ def main():
         print(f"Warning: Could not connect to Firestore: {e}")
         print("Duplicate checking will be DISABLED.")
         db = None
+        videos_ref = None
 
     results: List[Tuple[str, str]] = []
     errors: List[Tuple[str, str]] = []
 
+    # Phase 1: validate filenames and skip COMPLETED videos with batched reads
+    candidates: List[Path] = []
     for path in txt_files:
-        video_id = path.stem
-        if not is_video_id(video_id):
+        if not is_video_id(path.stem):
             errors.append((path.name, "filename is not a valid 11-char YouTube video ID"))
             continue
-
-        # 0) Check Firestore
-        if db:
-            doc_ref = videos_ref.document(video_id)
-            doc = doc_ref.get()
-            if doc.exists:
-                data = doc.to_dict()
-                status = data.get("status")
-                if status == "COMPLETED":
-                    print(f"Skipping {video_id}: Already marked as COMPLETED in Firestore.")
-                    results.append((video_id, "skipped_duplicate"))
-                    continue
-            
-            # Mark as PROCESSING
-            try:
-                doc_ref.set({
+        candidates.append(path)
+
+    completed = set()
+    if db:
+        for chunk in _chunks(candidates, _FIRESTORE_BATCH_LIMIT):
+            refs = [videos_ref.document(p.stem) for p in chunk]
+            for doc in db.get_all(refs):
+                if doc.exists and (doc.to_dict() or {}).get("status") == "COMPLETED":
+                    completed.add(doc.id)
+
+    to_process: List[Path] = []
+    for path in candidates:
+        if path.stem in completed:
+            print(f"Skipping {path.stem}: Already marked as COMPLETED in Firestore.")
+            results.append((path.stem, "skipped_duplicate"))
+        else:
+            to_process.append(path)
+
+    # Phase 2: mark the whole work set as PROCESSING in batched writes
+    if db:
+        for chunk in _chunks(to_process, _FIRESTORE_BATCH_LIMIT):
+            batch = db.batch()
+            for path in chunk:
+                batch.set(videos_ref.document(path.stem), {
                     "status": "PROCESSING",
                     "started_at": firestore.SERVER_TIMESTAMP,
-                    "video_id": video_id
+                    "video_id": path.stem
                 }, merge=True)
+            try:
+                batch.commit()
             except Exception as e:
                 print(f"Warning: Failed to update Firestore status: {e}")
-            
-            print(f"[New Video] Starting processing for {video_id}...")
-
-        try:
-            content = path.read_text(encoding="utf-8", errors="ignore")
-        except Exception as e:
-            errors.append((video_id, f"read_failed: {e}"))
-            if db:
-                doc_ref.set({"status": "FAILED", "error": str(e)}, merge=True)
-            continue
-
-        try:
-            uri = upload_to_gcs(args.bucket, video_id, content)
-            print(f"Uploaded {path.name} -> {uri}")
-        except Exception as e:
-            errors.append((video_id, f"upload_failed: {e}"))
-            if db:
-                doc_ref.set({"status": "FAILED", "error": str(e)}, merge=True)
-            continue
 
-        try:
-            _ = process_with_engine(args.engine, args.project, args.location, video_id)
-            print(f"Triggered agent for {video_id}")
-            results.append((video_id, "processed"))
-        except Exception as e:
-            errors.append((video_id, f"agent_failed: {e}"))
-            if db:
-                doc_ref.set({"status": "FAILED", "error": str(e)}, merge=True)
+    # Phase 3: upload + trigger the agent concurrently. Largest transcripts are
+    # submitted first (agent time tracks transcript size) so short ones fill the tail.
+    to_process.sort(key=lambda p: p.stat().st_size, reverse=True)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        futures = []
+        for path in to_process:
+            print(f"[New Video] Starting processing for {path.stem}...")
+            futures.append(ex.submit(process_file, path, args, videos_ref))
+        for fut in as_completed(futures):
+            video_id, outcome, msg = fut.result()
+            if outcome == "processed":
+                results.append((video_id, outcome))
+            else:
+                errors.append((video_id, msg))
 
     print("\n=== Summary ===")
     if results:
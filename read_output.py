@@ -1,15 +1,19 @@
+import io
+
+def _sniff_encoding(head: bytes) -> str:
+    # Decide the encoding from the BOM up front instead of retrying a full read
+    if head[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return "utf-16"
+    if head[:3] == b"\xef\xbb\xbf":
+        return "utf-8-sig"
+    return "utf-8"
+
 try:
-    with open("output.txt", "r", encoding="utf-16") as f:
-        for line in f:
+    with open("output.txt", "rb") as f:
+        enc = _sniff_encoding(f.read(4))
+        f.seek(0)
+        for line in io.TextIOWrapper(f, encoding=enc):
             if "Layer" in line:
                 print(line.strip())
 except Exception as e:
     print(f"Failed to read output.txt: {e}")
-    # Try utf-8 just in case
-    try:
-        with open("output.txt", "r", encoding="utf-8") as f:
-            for line in f:
-                if "Layer" in line:
-                    print(line.strip())
-    except Exception as e2:
-        print(f"Failed with utf-8 too: {e2}")
@@ -31,23 +31,37 @@ def parse_response(resp):
 print("--- Current Logic ---")
 parse_response(resp)
 
+# Fallback stringification is truncated so huge structured payloads are never fully repr'd
+_MAX_FALLBACK_CHARS = 2000
+
+def _fallback_text(val):
+    return repr(val)[:_MAX_FALLBACK_CHARS]
+
+def _text_from_list(val):
+    if not val:
+        return ""
+    first = val[0]
+    # Assuming first item has text
+    if isinstance(first, dict) and "text" in first:
+        return first["text"]
+    return first if isinstance(first, str) else _fallback_text(first)
+
+def _text_from_dict(val):
+    return val["text"] if "text" in val else _fallback_text(val)
+
+# Single dispatch on type(val) instead of chained isinstance checks
+_RESPONSE_EXTRACTORS = {
+    list: _text_from_list,
+    dict: _text_from_dict,
+    str: lambda v: v,
+}
+
 def parse_response_fixed(resp):
     resp_text = ""
     if isinstance(resp, dict):
         if "response" in resp:
             val = resp["response"]
-            # Handle list
-            if isinstance(val, list) and len(val) > 0:
-                # Assuming first item has text
-                if isinstance(val[0], dict) and "text" in val[0]:
-                    resp_text = val[0]["text"]
-                else:
-                    resp_text = str(val[0])
-            # Handle dict
-            elif isinstance(val, dict) and "text" in val:
-                resp_text = val["text"]
-            else:
-                resp_text = str(val)
+            resp_text = _RESPONSE_EXTRACTORS.get(type(val), _fallback_text)(val)
         elif "text" in resp:
             resp_text = resp["text"]
             
@@ -2,6 +2,10 @@ import argparse
 from google.cloud import firestore
 from google.cloud import storage
 
+# Max operations per Firestore WriteBatch / GCS batch request
+FIRESTORE_BATCH_LIMIT = 500
+GCS_BATCH_LIMIT = 1000
+
 def reset_videos(project: str, bucket_name: str):
     db = firestore.Client(project=project)
     storage_client = storage.Client(project=project)
@@ -15,24 +19,44 @@ def reset_videos(project: str, bucket_name: str):
         "jW89fT_pgOQ"
     ]
 
+    videos = [vid.strip() for vid in videos]
     print(f"Resetting {len(videos)} videos...")
 
-    for vid in videos:
-        vid = vid.strip()
-        print(f"Resetting {vid}...")
-
-        # 1. Delete from Firestore
-        doc_ref = db.collection("video_status").document(vid)
-        doc_ref.delete()
-        print(f"  - Deleted from Firestore (video_status)")
+    # 1. Delete from Firestore (one WriteBatch per 500 docs)
+    for i in range(0, len(videos), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for vid in videos[i:i + FIRESTORE_BATCH_LIMIT]:
+            batch.delete(db.collection("video_status").document(vid))
+        batch.commit()
+    print(f"  - Deleted {len(videos)} docs from Firestore (video_status)")
 
-        # 2. Delete from GCS Cache
-        blob = bucket.blob(f"{vid}.txt")
-        if blob.exists():
-            blob.delete()
-            print(f"  - Deleted from GCS Cache ({vid}.txt)")
-        else:
-            print(f"  - GCS Cache not found (already deleted?)")
+    # 2. Delete from GCS Cache (one multipart batch request per 1000 blobs).
+    # raise_exception=False keeps one bad sub-request from aborting the batch, so
+    # each sub-response is checked here: 404 (already deleted) is fine, any other
+    # error status is counted and reported.
+    deleted = missing = 0
+    failed = []
+    for i in range(0, len(videos), GCS_BATCH_LIMIT):
+        names = [f"{vid}.txt" for vid in videos[i:i + GCS_BATCH_LIMIT]]
+        with storage_client.batch(raise_exception=False) as gcs_batch:
+            bucket.delete_blobs(names)
+        # Batch keeps the per-request responses (in request order) only on _responses;
+        # fail loudly rather than report zeros if that private attribute ever changes
+        responses = getattr(gcs_batch, "_responses", None)
+        if responses is None or len(responses) != len(names):
+            got = "none" if responses is None else len(responses)
+            raise RuntimeError(f"GCS batch returned {got} responses for {len(names)} deletes; "
+                               "cannot tell which blobs were removed")
+        for name, resp in zip(names, responses):
+            if resp.status_code < 400:
+                deleted += 1
+            elif resp.status_code == 404:
+                missing += 1
+            else:
+                failed.append((name, resp.status_code))
+    print(f"  - Deleted {deleted} blobs from GCS Cache ({missing} already missing, {len(failed)} failed)")
+    for name, status in failed:
+        print(f"    ! {name}: HTTP {status}")
 
 if __name__ == "__main__":
     reset_videos("nate-digital-twin", "nate-digital-twin-transcript-cache")
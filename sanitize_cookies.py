@@ -23,30 +23,29 @@ HEADER = (
 
 
 def sanitize(in_path: Path, out_path: Path) -> None:
-    raw = in_path.read_text(encoding="utf-8", errors="ignore").splitlines()
-
-    out_lines = []
     kept = 0
     dropped = 0
 
-    # Always write canonical header
-    out_lines.extend(HEADER.splitlines())
-
-    for line in raw:
-        if not line:
-            continue
-        if line.lstrip().startswith("#"):
-            # Keep comments after header as-is (optional)
-            continue
-        parts = line.split("\t")
-        if len(parts) == 7:
-            out_lines.append("\t".join(p.strip() for p in parts))
-            kept += 1
-        else:
-            dropped += 1
-
-    out_text = "\n".join(out_lines) + "\n"
-    out_path.write_text(out_text, encoding="utf-8")
+    # Stream line-by-line so memory stays flat regardless of cookie jar size
+    with in_path.open("r", encoding="utf-8", errors="ignore") as fi, \
+            out_path.open("w", encoding="utf-8", newline="\n") as fo:
+        # Always write canonical header
+        fo.write(HEADER)
+
+        for line in fi:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            if line.lstrip().startswith("#"):
+                # Keep comments after header as-is (optional)
+                continue
+            parts = line.split("\t")
+            if len(parts) == 7:
+                fo.write("\t".join(p.strip() for p in parts) + "\n")
+                kept += 1
+            else:
+                dropped += 1
+
     print(f"Wrote {out_path} (kept {kept} cookies, dropped {dropped} malformed lines)")
 
 
@@ -1,23 +1,21 @@
 
 import os
-import yt_dlp
+from concurrent.futures import ThreadPoolExecutor
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from ingest_videos import get_upload_date_ytdlp
+
+# Shared API instance so the underlying HTTP session (keep-alive/TLS) is reused across calls
+_API = YouTubeTranscriptApi()
+
 def get_date_via_ytdlp(vid, cookies_path=None):
     print(f"Fetching date for {vid}...")
     try:
-        url = f"https://www.youtube.com/watch?v={vid}"
-        ydl_opts = {
-            'quiet': True,
-            'skip_download': True,
-            'cookiefile': cookies_path if cookies_path and os.path.exists(cookies_path) else None
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            upload_date = info.get('upload_date')
-            print(f"Raw upload_date: {upload_date}")
-            if upload_date and len(upload_date) == 8:
-                return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+        cookiefile = cookies_path if cookies_path and os.path.exists(cookies_path) else None
+        upload_date = get_upload_date_ytdlp(vid, cookiefile)
+        print(f"Raw upload_date: {upload_date}")
+        if upload_date and len(upload_date) == 8:
+            return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
     except Exception as e:
         print(f"Warning: Failed to fetch date: {e}")
     return "unknown"
@@ -25,7 +23,7 @@ def get_date_via_ytdlp(vid, cookies_path=None):
 def fetch_transcript_en(video_id):
     print(f"Fetching transcript for {video_id}...")
     try:
-        api = YouTubeTranscriptApi()
+        api = _API
         transcript_list = api.list(video_id)
         try:
             transcript = transcript_list.find_transcript(['en', 'en-US', 'en-GB'])
@@ -33,7 +31,7 @@ def fetch_transcript_en(video_id):
             transcript = transcript_list.find_generated_transcript(['en', 'en-US', 'en-GB'])
         
         fetched = transcript.fetch()
-        text = "\n".join([item.text for item in fetched])
+        text = "\n".join(item.text for item in fetched)
         print(f"Transcript fetched: {len(text)} chars")
         return text
     except Exception as e:
@@ -42,10 +40,13 @@ def fetch_transcript_en(video_id):
 
 def test_fetch(video_id):
     cookies_path = "cookies.txt"
-    date = get_date_via_ytdlp(video_id, cookies_path)
+    # Date and transcript lookups are independent network calls; overlap them
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_date = ex.submit(get_date_via_ytdlp, video_id, cookies_path)
+        f_transcript = ex.submit(fetch_transcript_en, video_id)
+        date, transcript = f_date.result(), f_transcript.result()
     print(f"Date Result: {date}")
     
-    transcript = fetch_transcript_en(video_id)
     if transcript:
         print("Transcript Result: Success")
     else:
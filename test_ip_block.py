@@ -1,8 +1,11 @@
 from youtube_transcript_api import YouTubeTranscriptApi
 
+# Shared API instance so the underlying HTTP session (keep-alive/TLS) is reused across calls
+_API = YouTubeTranscriptApi()
+
 try:
     print("Testing YouTubeTranscriptApi.list('HfvO5Hcdyt4')...")
-    api = YouTubeTranscriptApi()
+    api = _API
     t_list = api.list("HfvO5Hcdyt4")
     print("List Success!")
     
@@ -1,3 +1,4 @@
+import functools
 import vertexai
 from vertexai.language_models import TextGenerationModel
 import time
@@ -5,6 +6,11 @@ import time
 PROJECT_ID = "nate-digital-twin"
 LOCATION = "us-central1"
 
+@functools.lru_cache(maxsize=8)
+def _get_model(name):
+    # from_pretrained hits the Vertex control plane; reuse the handle per model name
+    return TextGenerationModel.from_pretrained(name)
+
 def test_legacy():
     print(f"Initializing Vertex AI for {PROJECT_ID}...")
     try:
@@ -15,7 +21,7 @@ def test_legacy():
 
     print("\nTesting text-bison (Legacy)...")
     try:
-        model = TextGenerationModel.from_pretrained("text-bison")
+        model = _get_model("text-bison")
         response = model.predict("Hello")
         print(f"SUCCESS: text-bison works! Response: {response.text.strip()}")
     except Exception as e:
@@ -1,19 +1,30 @@
 
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 PROCESSOR_URL = "https://us-central1-nate-digital-twin.cloudfunctions.net/transcript-processor-and-classifier"
 
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount("https://", adapter)
+    return session
+
+# Shared keep-alive session so repeated calls skip the TCP/TLS handshake
+_SESSION = _make_session()
+
 def test_processor():
     # Simulate the text with injected date
     text = "This video was published on 2025-06-23.\n\nHere is the transcript content about AI strategy..."
     
     payload = {"transcript_text": text}
-    headers = {"Content-Type": "application/json"}
     
     print(f"Sending text to Processor: {text}")
     try:
-        response = requests.post(PROCESSOR_URL, json=payload, headers=headers)
+        response = _SESSION.post(PROCESSOR_URL, json=payload)
         response.raise_for_status()
         result = response.json()
         print("\n--- Processor Result ---")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 """
-Quickly test YouTube transcript retrieval for a single video.
+Quickly test YouTube transcript retrieval for one or more videos.
 
 Usage:
   python test_transcript_fetch.py --video https://youtu.be/aVXtoWm1DEM
@@ -8,18 +8,37 @@ Usage:
 
 Optional: pass exported cookies.txt (Netscape format) to avoid 429:
   python test_transcript_fetch.py --video <url_or_id> --cookies cookies.txt
+
+Batch mode (fetches concurrently):
+  python test_transcript_fetch.py --videos <url_or_id> <url_or_id> ...
 """
 
 import argparse
-from ingest_videos import extract_video_id, fetch_transcript_en, _list_tracks
+import asyncio
+from ingest_videos import extract_video_id, fetch_transcript_en, fetch_transcripts_many, _list_tracks
+
+
+def run_batch(videos, cookies_path, concurrency):
+    vids = [extract_video_id(v) for v in videos]
+    results = asyncio.run(fetch_transcripts_many(vids, cookies_path=cookies_path, concurrency=concurrency))
+    for vid in vids:
+        text, date = results[vid]
+        print(f"{vid}: {len(text) if text else 0} chars, date={date}")
 
 
 def main():
     ap = argparse.ArgumentParser(description="Test YouTube transcript retrieval")
-    ap.add_argument("--video", required=True, help="YouTube URL or 11-char video ID")
+    target = ap.add_mutually_exclusive_group(required=True)
+    target.add_argument("--video", help="YouTube URL or 11-char video ID")
+    target.add_argument("--videos", nargs="+", help="Several YouTube URLs/IDs to fetch concurrently")
     ap.add_argument("--cookies", help="Path to cookies.txt (Netscape format) for yt-dlp")
+    ap.add_argument("--concurrency", type=int, default=8, help="Max concurrent fetches in --videos mode")
     args = ap.parse_args()
 
+    if args.videos:
+        run_batch(args.videos, args.cookies, args.concurrency)
+        return
+
     vid = extract_video_id(args.video)
     print(f"Video ID: {vid}")
     # Show available tracks for diagnosis
@@ -1,10 +1,25 @@
 
+import re
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from google.cloud import storage
 
 UPDATER_URL = "https://us-central1-nate-digital-twin.cloudfunctions.net/anthology-updater"
 ANTHOLOGY_BUCKET = "nate-digital-twin-anthologies-djr"
+# How much of the anthology tail to fetch before falling back to a full download
+TAIL_BYTES = 64 * 1024
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount("https://", adapter)
+    return session
+
+# Shared keep-alive session so repeated calls skip the TCP/TLS handshake
+_SESSION = _make_session()
 
 def test_updater():
     video_id = "TEST_ID_002"
@@ -16,11 +31,10 @@ def test_updater():
         "theme": theme,
         "video_id": video_id
     }
-    headers = {"Content-Type": "application/json"}
     
     print(f"Calling Updater for {video_id}...")
     try:
-        response = requests.post(UPDATER_URL, json=payload, headers=headers)
+        response = _SESSION.post(UPDATER_URL, json=payload)
         response.raise_for_status()
         print("Updater response:", response.json())
         
@@ -28,14 +42,22 @@ def test_updater():
         print(f"Checking GCS bucket {ANTHOLOGY_BUCKET} for {theme}.md...")
         client = storage.Client()
         bucket = client.bucket(ANTHOLOGY_BUCKET)
-        blob = bucket.blob(f"{theme}.md")
+        # get_blob loads metadata (size) in the same call used to check existence
+        blob = bucket.get_blob(f"{theme}.md")
         
-        if blob.exists():
-            file_content = blob.download_as_text()
+        if blob is not None:
+            # New entries are appended, so read only the tail first; fall back to the full file
+            id_re = re.compile(re.escape(video_id))
+            tail_start = max(0, blob.size - TAIL_BYTES)
+            file_content = blob.download_as_bytes(start=tail_start).decode("utf-8", errors="ignore")
+            match = id_re.search(file_content)
+            if match is None and tail_start > 0:
+                file_content = blob.download_as_text()
+                match = id_re.search(file_content)
             print("\n--- File Content ---")
             # Find our entry
-            if video_id in file_content:
-                idx = file_content.find(video_id)
+            if match:
+                idx = match.start()
                 # Print surrounding context
                 start = max(0, idx - 50)
                 end = min(len(file_content), idx + 200)
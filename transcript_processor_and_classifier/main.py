@@ -1,12 +1,14 @@
 # main.py
 import os
+import json
 from flask import jsonify
 
 # Import the Vertex AI SDK
 import vertexai
-from vertexai.generative_models import GenerativeModel
+from vertexai.generative_models import GenerationConfig, GenerativeModel
 import re
 from datetime import datetime
+from typing import Optional
 
 # Initialize Vertex AI. This is best done globally.
 # The PROJECT_ID and REGION are automatically discovered by the library.
@@ -16,14 +18,74 @@ model = GenerativeModel("gemini-2.5-flash") # Using 2.5 Flash for its large cont
 # Deterministic generation config to reduce run-to-run variance
 GEN_CONFIG = {"temperature": 0}
 
-def _call_llm_for_processing(raw_text: str) -> str:
-    """
-    Makes the first LLM call to distill the transcript through a specific analytical lens.
-    """
-    print("Executing LLM call 1: Distillation and Structuring...")
+# Canonical theme names, keyed by their lowercase form
+CANON = {
+    "ai strategy & leadership": "AI Strategy & Leadership",
+    "prompt & context engineering": "Prompt & Context Engineering",
+    "agentic architectures & systems": "Agentic Architectures & Systems",
+    "model analysis & limitations": "Model Analysis & Limitations",
+    "market analysis & future trends": "Market Analysis & Future Trends",
+    "news & weekly recap": "News & Weekly Recap",
+    "uncategorized": "Uncategorized",
+}
+# Lowercase keys plus the canonical spellings themselves
+THEME_LOOKUP = {**CANON, **{v: v for v in CANON.values()}}
 
-    # This is the new, more sophisticated prompt.
-    prompt = f"""
+# Single-call config: distillation + classification returned as one JSON object.
+# Built as a GenerationConfig (not a raw dict) so an SDK that doesn't understand
+# response_schema fails at import instead of silently degrading every request.
+COMBINED_GEN_CONFIG = GenerationConfig(
+    temperature=0,
+    response_mime_type="application/json",
+    response_schema={
+        "type": "OBJECT",
+        "properties": {
+            "processed_transcript": {"type": "STRING"},
+            "theme": {"type": "STRING", "enum": list(CANON.values())},
+        },
+        "required": ["processed_transcript", "theme"],
+    },
+)
+
+# Keyword -> category hints used to rescue documents the LLM left "Uncategorized"
+# (on either the combined or the two-call path); a confident LLM theme is never
+# overridden. Only phrases that identify a single theme belong here; generic words
+# ("market", "leadership", "benchmark", "this week", ...) show up across themes.
+THEME_KEYWORDS = {
+    "AI Strategy & Leadership": (
+        "change management", "business strategy", "ai adoption", "organizational change",
+        "return on investment",
+    ),
+    "Prompt & Context Engineering": (
+        "prompt engineering", "context engineering", "retrieval-augmented",
+        "metaprompt", "metaprompting", "chunking strategy",
+    ),
+    "Agentic Architectures & Systems": (
+        "agentic", "multi-agent", "tool calling", "mcp", "model context protocol",
+        "agent architecture",
+    ),
+    "Model Analysis & Limitations": (
+        "scaling law", "scaling laws", "model limitations", "tokenization",
+        "attention mechanism",
+    ),
+    "Market Analysis & Future Trends": (
+        "competitive landscape", "market share", "market analysis", "industry trends",
+    ),
+    "News & Weekly Recap": (
+        "weekly recap", "news roundup", "this week in ai",
+    ),
+}
+_KEYWORD_TO_THEME = {kw: theme for theme, kws in THEME_KEYWORDS.items() for kw in kws}
+# One multi-literal scan (longest keywords first so phrases win over their prefixes)
+_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in sorted(_KEYWORD_TO_THEME, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+# Only the header (Core Thesis / Key Concepts) is scanned
+KEYWORD_SCAN_CHARS = 4000
+KEYWORD_MIN_MARGIN = 2
+
+ANALYST_BRIEF = """
     **Role and Goal:**
     You are an expert AI strategist and a critical analyst, acting as my research partner. Your primary function is to distill the core, non-obvious insights from the provided transcript. You are not a generic summarizer. Your goal is to create a high-signal, information-dense summary that captures the true "gems of wisdom" from the talk, not just a list of topics.
 
@@ -32,16 +94,40 @@ def _call_llm_for_processing(raw_text: str) -> str:
     - **Pragmatic Engineering over Hype:** Focus on actionable, real-world strategies for building robust systems, especially those that challenge marketing hype or simplistic narratives.
     - **Mental Models & Frameworks:** Identify and extract novel analogies or structured frameworks that provide a new way to think about a problem.
     - **Counter-Intuitive Findings:** Highlight insights that go against common wisdom or reveal a surprising truth about AI behavior.
+"""
 
-    **Task:**
-    Process the following raw transcript and transform it into a clean, structured, and readable document. Follow these instructions precisely:
+PROCESSING_STEPS = """
     1.  **Analyze the entire transcript** through the guiding principles above.
     2.  **Generate a structured header.** The header must contain:
         - A level-two Markdown heading `## Core Thesis` followed by a concise, one or two-sentence summary of the speaker's main, non-obvious argument, framed by your analytical role.
         - A level-two Markdown heading `## Key Concepts` followed by a bulleted list of the most important mental models, frameworks, and counter-intuitive findings discussed.
     3.  **Add a separator** `---` after the header.
     4.  **Clean the main body of the transcript.** This involves removing any timestamps or speaker labels. Preserve the original paragraph breaks. Do not summarize the body; it should be the full, cleaned text.
+"""
+
+CATEGORY_LIST = """
+    **Predefined Categories:**
+    1.  **AI Strategy & Leadership:** For content focused on business integration, change management, ROI, organizational structure, and high-level strategic planning for AI.
+    2.  **Prompt & Context Engineering:** For content focused on the practical craft of prompting, context window management, chunking strategies, and specific techniques (e.g., RAG, Metaprompting).
+    3.  **Agentic Architectures & Systems:** For content focused on the design of AI agents, tool use, memory systems, protocols like MCP, and hybrid architectures.
+    4.  **Model Analysis & Limitations:** For content focused on the analysis of specific AI models, their underlying mechanisms, theoretical limitations, and core AI theory.
+    5.  **Market Analysis & Future Trends:** For content focused on the broader AI market, competitive landscape, emerging technologies, and future predictions for the industry.
+    6.  **News & Weekly Recap:** For news roundups, weekly recaps, and time-sensitive updates.
+    6.  **Uncategorized:** If the document does not clearly fit into any of the above categories.
+"""
 
+def _call_llm_for_processing(raw_text: str) -> str:
+    """
+    Makes the first LLM call to distill the transcript through a specific analytical lens.
+    """
+    print("Executing LLM call 1: Distillation and Structuring...")
+
+    # This is the new, more sophisticated prompt.
+    prompt = f"""
+    {ANALYST_BRIEF}
+    **Task:**
+    Process the following raw transcript and transform it into a clean, structured, and readable document. Follow these instructions precisely:
+    {PROCESSING_STEPS}
     **Raw Transcript:**
     ---
     {raw_text}
@@ -64,15 +150,7 @@ def _call_llm_for_classification(processed_text: str) -> str:
     prompt = f"""
     You are an expert document classifier. Your task is to assign the following document to one, and only one, of the predefined thematic categories.
 
-    **Predefined Categories:**
-    1.  **AI Strategy & Leadership:** For content focused on business integration, change management, ROI, organizational structure, and high-level strategic planning for AI.
-    2.  **Prompt & Context Engineering:** For content focused on the practical craft of prompting, context window management, chunking strategies, and specific techniques (e.g., RAG, Metaprompting).
-    3.  **Agentic Architectures & Systems:** For content focused on the design of AI agents, tool use, memory systems, protocols like MCP, and hybrid architectures.
-    4.  **Model Analysis & Limitations:** For content focused on the analysis of specific AI models, their underlying mechanisms, theoretical limitations, and core AI theory.
-    5.  **Market Analysis & Future Trends:** For content focused on the broader AI market, competitive landscape, emerging technologies, and future predictions for the industry.
-    6.  **News & Weekly Recap:** For news roundups, weekly recaps, and time-sensitive updates.
-    6.  **Uncategorized:** If the document does not clearly fit into any of the above categories.
-
+    {CATEGORY_LIST}
     **Instructions:**
     Analyze the following document. Based on its Core Thesis and Key Concepts, determine which single category it best fits into. Your response MUST be only the exact name of the category and nothing else.
 
@@ -85,24 +163,15 @@ def _call_llm_for_classification(processed_text: str) -> str:
     response = model.generate_content(prompt, generation_config=GEN_CONFIG)
     
     # Clean up the response to ensure it's just the category name.
-    theme = response.text.strip()
-
-    # Normalize to one of the predefined categories to avoid drift
-    CANON = {
-        "ai strategy & leadership": "AI Strategy & Leadership",
-        "prompt & context engineering": "Prompt & Context Engineering",
-        "agentic architectures & systems": "Agentic Architectures & Systems",
-        "model analysis & limitations": "Model Analysis & Limitations",
-        "market analysis & future trends": "Market Analysis & Future Trends",
-        "news & weekly recap": "News & Weekly Recap",
-        "uncategorized": "Uncategorized",
-    }
+    return _normalize_theme(response.text.strip())
 
-    theme_lc = theme.lower().strip()
-    # Remove any stray punctuation or trailing dots
-    if theme_lc.endswith('.'):
-        theme_lc = theme_lc[:-1]
-    candidate = CANON.get(theme_lc)
+
+def _normalize_theme(theme: str) -> str:
+    """Map a model-produced theme onto one of the canonical category names."""
+    # One strip pass (whitespace, then stray trailing dots); exact canonical
+    # spellings hit directly, anything else gets a single lowercase lookup.
+    key = theme.strip().rstrip('.')
+    candidate = THEME_LOOKUP.get(key) or THEME_LOOKUP.get(key.lower())
     if candidate is None:
         # Fallback to Uncategorized if the model produced a near-miss
         normalized = "Uncategorized"
@@ -114,17 +183,71 @@ def _call_llm_for_classification(processed_text: str) -> str:
     return normalized
 
 
+def _keyword_classify(processed_text: str) -> Optional[str]:
+    """Classify from keyword hits in the document header; None when ambiguous."""
+    votes: dict[str, int] = {}
+    for m in _KEYWORD_RE.finditer(processed_text, 0, KEYWORD_SCAN_CHARS):
+        theme = _KEYWORD_TO_THEME[m.group(0).lower()]
+        votes[theme] = votes.get(theme, 0) + 1
+    if not votes:
+        return None
+    ranked = sorted(votes.values(), reverse=True)
+    runner_up = ranked[1] if len(ranked) > 1 else 0
+    if ranked[0] - runner_up < KEYWORD_MIN_MARGIN:
+        return None
+    theme = max(votes, key=votes.get)
+    print(f"Keyword classifier chose '{theme}' (votes={votes}).")
+    return theme
+
+
+def _call_llm_for_processing_and_classification(raw_text: str) -> tuple[str, str]:
+    """
+    Distills and classifies the transcript in a single LLM call that returns JSON,
+    halving round trips versus the two-call path. Returns (processed_transcript, theme).
+    """
+    print("Executing combined LLM call: Distillation + Classification...")
+
+    prompt = f"""
+    {ANALYST_BRIEF}
+    **Task:**
+    Produce a JSON object with two fields, "processed_transcript" and "theme".
+
+    For "processed_transcript", process the following raw transcript into a clean, structured, and readable document. Follow these instructions precisely:
+    {PROCESSING_STEPS}
+    For "theme", assign the document to one, and only one, of the predefined thematic categories, based on its Core Thesis and Key Concepts. The value MUST be only the exact name of the category.
+    {CATEGORY_LIST}
+    **Raw Transcript:**
+    ---
+    {raw_text}
+    ---
+    """
+
+    response = model.generate_content(prompt, generation_config=COMBINED_GEN_CONFIG)
+    data = json.loads(response.text)
+    return data["processed_transcript"], _normalize_theme(str(data["theme"]))
+
+
+# Applied with .match bounded to the first line (pos/endpos), so blanks are [ \t] only and \Z ends at endpos
+_DATE_RE = re.compile(r"date[ \t]*:[ \t]*([0-9]{1,2})[./-]([0-9]{1,2})[./-]([0-9]{4})[ \t\r]*\Z", re.IGNORECASE)
+
 def _extract_date_iso(raw_text: str) -> tuple[str, str]:
     """Extract a leading 'date: ...' line and return (normalized_date, text_without_date).
     - Accepts patterns like 'date: 11-04-2025' (MM-DD-YYYY) or with '/', '.' separators.
     - Normalizes to ISO 'YYYY-MM-DD'. If ambiguous, prefers MM-DD if first <=12.
     - Returns ("unknown", original_text) if not found or unparsable.
     """
-    lines = raw_text.splitlines()
-    if not lines:
+    # Only the first line matters; bound the match with pos/endpos instead of
+    # slicing it out.
+    nl = raw_text.find("\n")
+    end = nl if nl >= 0 else len(raw_text)
+    start = 0
+    while start < end and raw_text[start] in " \t":
+        start += 1
+    # Most transcripts have no date line: fail fast on the literal prefix before
+    # entering the regex. 13 is the shortest valid form, 'date:d-d-yyyy'.
+    if end - start < 13 or raw_text[start:start + 4].lower() != "date":
         return "unknown", raw_text
-    first = lines[0].strip()
-    m = re.match(r"^date\s*:\s*([0-9]{1,2})[./-]([0-9]{1,2})[./-]([0-9]{4})\s*$", first, flags=re.IGNORECASE)
+    m = _DATE_RE.match(raw_text, start, end)
     if not m:
         return "unknown", raw_text
     a, b, y = m.groups()
@@ -139,9 +262,9 @@ def _extract_date_iso(raw_text: str) -> tuple[str, str]:
         iso = dt.strftime("%Y-%m-%d")
     except Exception:
         return "unknown", raw_text
-    # Drop the first line
-    without = "\n".join(lines[1:])
-    return iso, without
+    # Drop the first line; normalize line endings in the rest as splitlines() did
+    rest = raw_text[nl + 1:] if nl >= 0 else ""
+    return iso, rest.replace("\r\n", "\n").replace("\r", "\n")
 
 def transcript_processor_and_classifier(request):
     """
@@ -168,8 +291,16 @@ def transcript_processor_and_classifier(request):
     normalized_date, cleaned_text = _extract_date_iso(raw_text)
 
     try:
-        processed_transcript = _call_llm_for_processing(cleaned_text)
-        theme = _call_llm_for_classification(processed_transcript)
+        try:
+            processed_transcript, theme = _call_llm_for_processing_and_classification(cleaned_text)
+        except (ValueError, KeyError, TypeError) as e:
+            # Malformed structured output: fall back to the two-call path
+            print(f"WARNING: combined LLM call failed ({type(e).__name__}: {e}). Falling back to two calls.")
+            processed_transcript = _call_llm_for_processing(cleaned_text)
+            theme = _call_llm_for_classification(processed_transcript)
+
+        if theme == "Uncategorized":
+            theme = _keyword_classify(processed_transcript) or theme
 
         return jsonify({
             "processed_transcript": processed_transcript,
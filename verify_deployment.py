@@ -1,4 +1,5 @@
 # verify_deployment.py
+import functools
 import vertexai
 from vertexai import agent_engines
 
@@ -7,12 +8,17 @@ LOCATION = "us-central1"
 # Resource ID captured from deployment output
 AGENT_RESOURCE = "projects/134885012683/locations/us-central1/reasoningEngines/4486055819837702144"
 
+@functools.lru_cache(maxsize=8)
+def _get_agent(resource_id):
+    # agent_engines.get is a control-plane RPC; reuse the handle per resource ID
+    return agent_engines.get(resource_id)
+
 def test_agent():
     print(f"--- Connecting to Agent: {AGENT_RESOURCE} ---")
     vertexai.init(project=PROJECT_ID, location=LOCATION)
     
     try:
-        agent = agent_engines.get(AGENT_RESOURCE)
+        agent = _get_agent(AGENT_RESOURCE)
         print("Agent retrieved successfully.")
     except Exception as e:
         print(f"FAIL: Could not retrieve agent: {e}")